@@ -24,6 +24,8 @@ if not is_pedpy_installed():
     bl_info["warning"] = "Requires external Python packages (pedpy). See addon preferences."
 
 
+import os
+
 import bpy
 from bpy.props import (
     StringProperty,
@@ -40,28 +42,31 @@ from . import panels
 from . import preferences
 
 
+def update_sqlite_file(self, context):
+    """Cache the file name shown in the panel when the file path changes."""
+    self.sqlite_file_basename = (
+        os.path.basename(self.sqlite_file) if self.sqlite_file else ""
+    )
+
+
 def update_path_visibility(self, context):
-    """Update visibility of all agent path curves when property changes."""
-    if "JuPedSim_Agents" not in bpy.data.collections:
+    """Update visibility of the agent path collection when property changes."""
+    if "JuPedSim_Paths" not in bpy.data.collections:
         return
 
-    collection = bpy.data.collections["JuPedSim_Agents"]
-    for obj in collection.objects:
-        if obj.name.startswith("Path_Agent_"):
-            obj.hide_viewport = not self.show_paths
-            obj.hide_render = not self.show_paths
+    collection = bpy.data.collections["JuPedSim_Paths"]
+    collection.hide_viewport = not self.show_paths
+    collection.hide_render = not self.show_paths
 
 
 def update_agent_scale(self, context):
-    """Update scale of all agent meshes when property changes."""
-    if "JuPedSim_Agents" not in bpy.data.collections:
-        return
-    collection = bpy.data.collections["JuPedSim_Agents"]
-    for obj in collection.objects:
-        if obj.name.startswith("Agent_") and obj.type == 'MESH':
-            obj.scale = (self.agent_scale, self.agent_scale, self.agent_scale)
-        if obj.name == "JuPedSim_ParticleInstance" and obj.type == 'MESH':
-            obj.scale = (self.agent_scale, self.agent_scale, self.agent_scale)
+    """Update scale of the shared agent mesh and particle instance when property changes."""
+    mesh = bpy.data.meshes.get("JuPedSim_Agent_Mesh")
+    if mesh is not None:
+        operators.fill_agent_mesh(mesh, self.agent_scale)
+    instance_obj = bpy.data.objects.get("JuPedSim_ParticleInstance")
+    if instance_obj is not None and instance_obj.type == 'MESH':
+        instance_obj.scale = (self.agent_scale, self.agent_scale, self.agent_scale)
 
 
 def update_geometry_thickness(self, context):
@@ -82,6 +87,14 @@ class JuPedSimProperties(PropertyGroup):
         description="Path to the JuPedSim trajectory SQLite file",
         default="",
         subtype='FILE_PATH',
+        update=update_sqlite_file,
+    )
+
+    sqlite_file_basename: StringProperty(
+        name="SQLite File Name",
+        description="File name of the selected SQLite file, for display",
+        default="",
+        options={'HIDDEN'},
     )
     
     frame_step: IntProperty(
@@ -99,12 +112,30 @@ class JuPedSimProperties(PropertyGroup):
         default=False,
     )
 
+    auto_big_data_mode: BoolProperty(
+        name="Auto Big Data Mode",
+        description=(
+            "Switch to Big Data Mode for simulations with more than 2000 agents "
+            "when the preloaded frame data fits in 1 GB"
+        ),
+        default=False,
+    )
+
     load_full_paths: BoolProperty(
         name="Load Full Paths",
         description="Load full agent paths as curves (can be very slow for large files)",
         default=False,
     )
 
+    skip_geometry_union: BoolProperty(
+        name="Skip Geometry Union",
+        description=(
+            "Draw the stored geometry polygons as-is instead of merging them first "
+            "(faster for many polygons; overlapping edges stay visible)"
+        ),
+        default=False,
+    )
+
     show_paths: BoolProperty(
         name="Show Agent Paths",
         description=(
@@ -164,6 +195,22 @@ class JuPedSimProperties(PropertyGroup):
         options={'HIDDEN'},
     )
 
+    loaded_geometry_count: IntProperty(
+        name="Loaded Geometry Count",
+        description="Number of geometry boundary curves in the loaded simulation",
+        default=0,
+        min=0,
+        options={'HIDDEN'},
+    )
+
+    path_curve_count: IntProperty(
+        name="Path Curve Count",
+        description="Number of agent path curves in the loaded simulation",
+        default=0,
+        min=0,
+        options={'HIDDEN'},
+    )
+
 
 # List of classes to register
 classes = [
@@ -9,16 +9,43 @@ from bpy.props import StringProperty
 from bpy_extras.io_utils import ImportHelper
 import pathlib
 import threading
+from concurrent.futures import ThreadPoolExecutor
 import time
 import traceback
 import sqlite3
 import bmesh
-from array import array
+import numpy as np
 
 
+# Above this many agents, per-agent objects make the scene graph the
+# bottleneck, so the load may switch to Big Data Mode automatically.
+BIG_DATA_AGENT_THRESHOLD = 2000
+
+# The automatic switch only happens if the preloaded frame buffer stays
+# under this size; the user did not opt into Big Data Mode's RAM usage.
+BIG_DATA_AUTO_MAX_BYTES = 1 << 30
+
+# Big Data Mode preloads every sampled frame only up to this size; larger
+# files stream the particle positions from SQLite on each frame change.
+BIG_DATA_PRELOAD_MAX_BYTES = 4 << 30
+
+# Target wall time of one modal creation tick (about one 60 fps frame).
+TICK_BUDGET_SECONDS = 0.016
+
+# Per-frame query of the default streaming mode, shared by the frame handler
+# and the prefetch thread.
+STREAM_FRAME_SQL = (
+    "SELECT id, pos_x, pos_y FROM trajectory_data WHERE frame == (?) ORDER BY id ASC"
+)
+
+# Sampled frames the default-mode prefetcher keeps ready ahead of playback.
+PREFETCH_FRAMES = 32
+
 STREAM_STATE = {
     "db_path": None,
     "conn": None,
+    "cursor": None,
+    "prefetcher": None,  # default mode: _FramePrefetcher
     "min_frame": 0,
     "max_frame": 0,
     "frame_step": 1,
@@ -26,13 +53,17 @@ STREAM_STATE = {
     "id_to_index": {},
     "mode": None,  # "default" or "big"
     "objects": [],
-    "object_name": None,
+    "visible": set(),
+    "mesh": None,  # big mode: particle point mesh
+    "mesh_name": None,  # re-resolves "mesh" after undo invalidates it
+    "positions": None,  # big mode: (sampled frames, agents * 3) float32, or None to stream
+    "first_row": 0,
     "handler_installed": False,
 }
 
 
 def _stream_frame_handler(scene):
-    """Stream positions from sqlite for the current frame."""
+    """Stream positions for the current frame from sqlite (or the big-mode buffer)."""
     state = STREAM_STATE
     if not state["db_path"] or not state["agent_ids"]:
         return
@@ -42,58 +73,322 @@ def _stream_frame_handler(scene):
     if frame < state["min_frame"] or frame > state["max_frame"]:
         return
 
-    if state["conn"] is None:
-        state["conn"] = sqlite3.connect(state["db_path"], isolation_level=None)
-
-    cur = state["conn"].cursor()
-    res = cur.execute(
-        "SELECT id, pos_x, pos_y FROM trajectory_data WHERE frame == (?) ORDER BY id ASC",
-        (frame,),
-    )
-    rows = res.fetchall()
-
     if state["mode"] == "big":
-        obj = bpy.data.objects.get(state["object_name"])
-        if not obj or obj.type != 'MESH':
+        mesh = state["mesh"]
+        if mesh is None:
             return
-        total = len(state["agent_ids"])
-        hide_z = -1.0e6
-        coords = array('f', [0.0] * (total * 3))
-        for i in range(2, len(coords), 3):
-            coords[i] = hide_z
-        for agent_id, x, y in rows:
-            idx = state["id_to_index"].get(agent_id)
-            if idx is None:
-                continue
-            base = idx * 3
-            coords[base] = float(x)
-            coords[base + 1] = float(y)
-            coords[base + 2] = 0.5
-        obj.data.vertices.foreach_set("co", coords)
-        obj.data.update()
+        positions = state["positions"]
+        if positions is not None:
+            # Positions were preloaded by the worker; a frame change is one copy.
+            row = frame // max(1, state["frame_step"]) - state["first_row"]
+            if row < 0 or row >= len(positions):
+                return
+        try:
+            if not mesh.users:
+                return
+        except ReferenceError:
+            # Undo reallocates ID data; look the mesh up again by name and
+            # stop updating only if it was actually deleted.
+            mesh = bpy.data.meshes.get(state["mesh_name"] or "")
+            state["mesh"] = mesh
+            if mesh is None or not mesh.users:
+                return
+        if positions is not None:
+            coords = positions[row]
+        else:
+            # Too large to preload: build this frame's coordinates from SQLite.
+            coords = np.zeros((len(state["agent_ids"]), 3), dtype=np.float32)
+            coords[:, 2] = -1.0e6
+            for agent_id, x, y in _fetch_frame_rows(state, frame):
+                idx = state["id_to_index"].get(agent_id)
+                if idx is not None:
+                    coords[idx] = (x, y, 0.5)
+            coords = coords.ravel()
+        _set_mesh_positions(mesh, coords)
+        # Only vertex positions changed; tag instead of rebuilding derived data.
+        mesh.update_tag()
         return
 
-    # Default mode: update agent objects directly.
-    for obj in state["objects"]:
-        obj.hide_viewport = True
-        obj.hide_render = True
+    rows = _fetch_frame_rows(state, frame)
+
+    # Default mode: update agent objects directly, toggling visibility only
+    # for agents that entered or left the scene since the last update.
+    objects = state["objects"]
+    visible = set()
     for agent_id, x, y in rows:
         idx = state["id_to_index"].get(agent_id)
         if idx is None:
             continue
-        obj = state["objects"][idx]
-        obj.location = (float(x), float(y), 0.5)
-        obj.hide_viewport = False
-        obj.hide_render = False
+        objects[idx].location = (float(x), float(y), 0.5)
+        visible.add(idx)
+    for idx in state["visible"] - visible:
+        objects[idx].hide_viewport = True
+        objects[idx].hide_render = True
+    for idx in visible - state["visible"]:
+        objects[idx].hide_viewport = False
+        objects[idx].hide_render = False
+    state["visible"] = visible
+
+
+def _clear_stream_state():
+    """Remove frame handlers and clear streaming buffers."""
+    if STREAM_STATE["handler_installed"]:
+        if _stream_frame_handler in bpy.app.handlers.frame_change_pre:
+            bpy.app.handlers.frame_change_pre.remove(_stream_frame_handler)
+    if STREAM_STATE["prefetcher"] is not None:
+        STREAM_STATE["prefetcher"].stop()
+    if STREAM_STATE["conn"] is not None:
+        STREAM_STATE["conn"].close()
+    STREAM_STATE["db_path"] = None
+    STREAM_STATE["conn"] = None
+    STREAM_STATE["cursor"] = None
+    STREAM_STATE["prefetcher"] = None
+    STREAM_STATE["min_frame"] = 0
+    STREAM_STATE["max_frame"] = 0
+    STREAM_STATE["agent_ids"] = []
+    STREAM_STATE["id_to_index"] = {}
+    STREAM_STATE["mode"] = None
+    STREAM_STATE["objects"] = []
+    STREAM_STATE["visible"] = set()
+    STREAM_STATE["mesh"] = None
+    STREAM_STATE["mesh_name"] = None
+    STREAM_STATE["positions"] = None
+    STREAM_STATE["first_row"] = 0
+    STREAM_STATE["handler_installed"] = False
+
+
+def _fetch_frame_rows(state, frame):
+    """Return the ``(id, x, y)`` rows of ``frame``, prefetched when possible."""
+    prefetcher = state["prefetcher"]
+    rows = prefetcher.take(frame) if prefetcher is not None else None
+    if rows is None:
+        # Prefetch miss (first frame, jump or scrub): query synchronously.
+        if state["cursor"] is None:
+            state["conn"] = _connect_readonly(state["db_path"], immutable=True)
+            state["cursor"] = state["conn"].cursor()
+        rows = state["cursor"].execute(STREAM_FRAME_SQL, (frame,)).fetchall()
+    if prefetcher is not None:
+        prefetcher.advance(frame)
+    return rows
+
+
+def _set_mesh_positions(mesh, coords):
+    """Write flat float32 (x, y, z) vertex coordinates to ``mesh``.
+
+    The generic position attribute skips the legacy MVert layer; meshes
+    without one fall back to vertices.co.
+    """
+    try:
+        mesh.attributes["position"].data.foreach_set("vector", coords)
+    except KeyError:
+        mesh.vertices.foreach_set("co", coords)
+
+
+class _FramePrefetcher:
+    """Read upcoming default-mode frames on a background thread.
+
+    The frame handler takes ready rows with ``take`` and reports the current
+    frame with ``advance``; the thread then queries the following sampled
+    frames on its own connection, so playback rarely waits on SQLite.
+    """
+
+    def __init__(self, db_path, frame_step, max_frame, depth=PREFETCH_FRAMES):
+        self._db_path = db_path
+        self._frame_step = max(1, frame_step)
+        self._max_frame = max_frame
+        self._depth = depth
+        self._rows = {}
+        self._target = None
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def take(self, frame):
+        """Return the prefetched rows for ``frame``, or None if not ready."""
+        with self._cond:
+            return self._rows.pop(frame, None)
+
+    def advance(self, frame):
+        """Drop frames outside the window after ``frame`` and prefetch it."""
+        last = frame + self._depth * self._frame_step
+        with self._cond:
+            for cached in [f for f in self._rows if f <= frame or f > last]:
+                del self._rows[cached]
+            self._target = frame
+            self._cond.notify()
+
+    def stop(self):
+        """Stop the thread; an in-flight query is left to finish on its own."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join(timeout=1.0)
+
+    def _run(self):
+        conn = None
+        try:
+            conn = _connect_readonly(self._db_path, immutable=True)
+            cursor = conn.cursor()
+            step = self._frame_step
+            while True:
+                with self._cond:
+                    while self._target is None and not self._stopped:
+                        self._cond.wait()
+                    if self._stopped:
+                        return
+                    target = self._target
+                    self._target = None
+                    last = min(target + self._depth * step, self._max_frame)
+                    pending = [
+                        f for f in range(target + step, last + 1, step)
+                        if f not in self._rows
+                    ]
+                for frame in pending:
+                    rows = cursor.execute(STREAM_FRAME_SQL, (frame,)).fetchall()
+                    with self._cond:
+                        if self._stopped:
+                            return
+                        self._rows[frame] = rows
+                        if self._target is not None:
+                            # Playback moved on; plan a new window.
+                            break
+        except sqlite3.Error:
+            # The handler keeps working through synchronous queries.
+            traceback.print_exc()
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+def fill_agent_mesh(mesh, agent_scale):
+    """Rebuild the shared agent icosphere at the given display scale.
+
+    Every agent object links this mesh, so resizing it resizes all agents
+    without touching the objects themselves.
+    """
+    bm = bmesh.new()
+    bmesh.ops.create_icosphere(bm, subdivisions=2, radius=0.5 * agent_scale)
+    bm.to_mesh(mesh)
+    bm.free()
+    mesh.polygons.foreach_set("use_smooth", [True] * len(mesh.polygons))
+    mesh.update()
+
+
+def _connect_readonly(db_path, immutable=False):
+    """Open a read-only SQLite connection tuned for bulk reads.
+
+    ``immutable`` tells SQLite the file cannot change while open, so it takes
+    no locks per statement; used by the long-lived playback connections.
+    """
+    uri = pathlib.Path(db_path).resolve().as_uri()
+    if not uri.startswith("file:///"):
+        # UNC paths (and mapped drives, which resolve to them) become
+        # file://server/share/..., but SQLite only accepts an empty or
+        # "localhost" authority; move the host into the path instead.
+        uri = "file:////" + uri[len("file://"):]
+    uri += "?mode=ro"
+    if immutable:
+        uri += "&immutable=1"
+    conn = sqlite3.connect(uri, uri=True, isolation_level=None)
+    conn.execute("PRAGMA query_only=1")
+    conn.execute("PRAGMA mmap_size=1073741824")
+    conn.execute("PRAGMA cache_size=-200000")
+    return conn
+
+
+def _frame_rows(min_frame, max_frame, frame_step):
+    """Return ``(first_row, n_rows)`` of the sampled frames in the big-mode buffer."""
+    frame_step = max(1, frame_step)
+    first_row = -(-min_frame // frame_step)
+    n_rows = max(0, max_frame // frame_step - first_row + 1)
+    return first_row, n_rows
+
+
+def _has_frame_index(cursor):
+    """Return True if an index on trajectory_data has frame as its leading column.
+
+    Without one, every default-mode frame query scans the whole table.
+    """
+    res = cursor.execute(
+        "SELECT 1 FROM pragma_index_list('trajectory_data') AS il "
+        "JOIN pragma_index_info(il.name) AS ii "
+        "WHERE ii.seqno == 0 AND ii.name == 'frame' LIMIT 1"
+    )
+    return res.fetchone() is not None
+
+
+def _dense_id_lookup(agent_ids):
+    """Map agent ids to column indices through a dense array indexed by id.
+
+    Returns an int32 array where ``lookup[agent_id]`` is the agent's index
+    and -1 marks unknown ids, or None if the ids are too sparse for that.
+    """
+    ids = np.asarray(agent_ids, dtype=np.int64)
+    if not len(ids) or ids.min() < 0 or ids.max() >= max(4 * len(ids), 1 << 16):
+        return None
+    lookup = np.full(int(ids.max()) + 1, -1, dtype=np.int32)
+    lookup[ids] = np.arange(len(ids), dtype=np.int32)
+    return lookup
+
+
+def _iter_row_chunks(result, n_columns, chunk_rows=100_000):
+    """Yield a query result as float64 arrays of at most ``chunk_rows`` rows.
+
+    Only one chunk of Python row tuples is alive at a time, which bounds the
+    transient memory of bulk reads on large trajectory files.
+    """
+    while True:
+        rows = result.fetchmany(chunk_rows)
+        if not rows:
+            return
+        yield np.array(rows, dtype=np.float64).reshape(-1, n_columns)
+
+
+def _pack_curve_points(coords, z=0.0, out=None):
+    """Pack 2D coordinates into a flat float32 (x, y, z, w) buffer for foreach_set.
+
+    ``out`` may be a reusable (M, 4) float32 scratch array with M >= len(coords);
+    the returned buffer is then a view into it.
+    """
+    xy = np.asarray(coords, dtype=np.float32).reshape(len(coords), -1)[:, :2]
+    if out is None:
+        points = np.empty((len(xy), 4), dtype=np.float32)
+    else:
+        points = out[:len(xy)]
+    points[:, :2] = xy
+    points[:, 2] = z
+    points[:, 3] = 1.0
+    return points.ravel()
+
+
+def _adapt_chunk_size(chunk_size, done, elapsed, lo=1, hi=1000):
+    """Scale the next batch size so one tick takes about TICK_BUDGET_SECONDS."""
+    if done <= 0:
+        return chunk_size
+    # Grow at most 2x per tick so one fast tick cannot cause a long stall.
+    target = done * TICK_BUDGET_SECONDS / max(elapsed, 1e-4)
+    return max(lo, min(hi, int(min(target, 2 * chunk_size))))
+
+
+_DEPENDENCIES_OK = False
 
 
 def check_dependencies():
-    """Check if required dependencies are installed."""
+    """Check if required dependencies are installed.
+
+    Success is cached for the session; failures are re-checked so that
+    dependencies installed from the preferences are picked up.
+    """
+    global _DEPENDENCIES_OK
+    if _DEPENDENCIES_OK:
+        return True, None
     try:
         import shapely
-        return True, None
     except ImportError as e:
         return False, str(e)
+    _DEPENDENCIES_OK = True
+    return True, None
 
 
 class JUPEDSIM_OT_select_file(Operator, ImportHelper):
@@ -134,20 +429,28 @@ class JUPEDSIM_OT_load_simulation(Operator):
     _cancelled = False
     _timings = None
     _agent_groups = None
+    _agent_objects = None
     _agent_index = 0
     _path_index = 0
     _frame_step = 1
     _min_frame = 0
     _max_frame = 0
-    _sampled_frames = None
     _agents_collection = None
+    _paths_collection = None
     _geometry_collection = None
     _total_agents = 0
     _stage = None
     _big_data_mode = False
     _load_full_paths = False
+    _auto_big_data_mode = False
+    _skip_geometry_union = False
     _path_groups = None
     _materials = None
+    _agent_mesh = None
+    _path_curve = None
+    _path_points = None
+    _agent_chunk_size = 200
+    _path_chunk_size = 50
     
     def execute(self, context):
         """Start a modal load that keeps the UI responsive."""
@@ -180,6 +483,8 @@ class JUPEDSIM_OT_load_simulation(Operator):
         self._frame_step = props.frame_step
         self._big_data_mode = props.big_data_mode
         self._load_full_paths = props.load_full_paths
+        self._auto_big_data_mode = props.auto_big_data_mode
+        self._skip_geometry_union = props.skip_geometry_union
         self._cancel_event = threading.Event()
         props.loading_in_progress = True
         props.loading_progress = 0.0
@@ -233,7 +538,12 @@ class JUPEDSIM_OT_load_simulation(Operator):
         if self._stage == "create_collections":
             self._timed_start("create_collections")
             self._agents_collection = self._get_or_create_collection("JuPedSim_Agents")
+            self._paths_collection = self._get_or_create_collection(
+                "JuPedSim_Paths", parent=self._agents_collection
+            )
             self._geometry_collection = self._get_or_create_collection("JuPedSim_Geometry")
+            props.loaded_geometry_count = 0
+            props.path_curve_count = 0
             self._timed_end("create_collections")
             props.loading_message = "Preparing scene..."
             props.loading_progress = 10.0
@@ -245,6 +555,9 @@ class JUPEDSIM_OT_load_simulation(Operator):
             self._timed_end("create_geometry")
             props.loading_message = "Creating geometry..."
             props.loading_progress = 25.0
+            if not self._big_data_mode:
+                # Keep bulk agent/path creation out of the view layer until finalize.
+                self._set_agents_excluded(context, True)
             self._stage = "create_big_data" if self._big_data_mode else "create_agents"
 
         if self._stage == "create_agents":
@@ -271,15 +584,11 @@ class JUPEDSIM_OT_load_simulation(Operator):
 
         if self._stage == "finalize":
             self._timed_start("finalize")
+            self._set_agents_excluded(context, False)
             show_paths = props.show_paths
-            self._update_path_visibility(self._agents_collection, show_paths)
+            self._update_path_visibility(self._paths_collection, show_paths)
             if not self._big_data_mode:
-                objects = []
-                for agent_id in self._agent_groups:
-                    obj = bpy.data.objects.get(f"Agent_{agent_id}")
-                    if obj:
-                        objects.append(obj)
-                self._start_streaming("default", objects=objects)
+                self._start_streaming("default", objects=self._agent_objects)
             context.scene.frame_set(1)
             self._timed_end("finalize")
             props.loading_progress = 100.0
@@ -302,21 +611,29 @@ class JUPEDSIM_OT_load_simulation(Operator):
         self._cancelled = False
         self._timings = {}
         self._agent_groups = None
+        self._agent_objects = []
         self._agent_index = 0
         self._path_index = 0
         self._frame_step = 1
         self._min_frame = 0
         self._max_frame = 0
-        self._sampled_frames = None
         self._agents_collection = None
+        self._paths_collection = None
         self._geometry_collection = None
         self._total_agents = 0
         self._stage = None
         self._big_data_mode = False
         self._load_full_paths = False
+        self._auto_big_data_mode = False
+        self._skip_geometry_union = False
         self._path_groups = None
         self._materials = None
-        self._clear_stream_state()
+        self._agent_mesh = None
+        self._path_curve = None
+        self._path_points = None
+        self._agent_chunk_size = 200
+        self._path_chunk_size = 50
+        _clear_stream_state()
 
     def _finish_success(self, context):
         """Finalize a successful load."""
@@ -328,6 +645,7 @@ class JUPEDSIM_OT_load_simulation(Operator):
     def _finish_cancel(self, context):
         """Finalize a cancelled load while keeping partial data."""
         self._cleanup_timer(context)
+        self._set_agents_excluded(context, False)
         self._finalize_timings_on_cancel()
         self._log_timings()
         props = context.scene.jupedsim_props
@@ -352,32 +670,26 @@ class JUPEDSIM_OT_load_simulation(Operator):
 
     def _load_sqlite_worker(self, path, frame_step, cancel_event):
         """Load metadata and geometry in a worker thread to keep UI responsive."""
-        import shapely
         conn = None
+        # Geometry lives in its own table, so it is parsed on a second
+        # connection while this thread reads the trajectory data.
+        geometry_executor = ThreadPoolExecutor(max_workers=1)
         try:
             timings = {}
             start_total = time.perf_counter()
 
             start = time.perf_counter()
-            conn = sqlite3.connect(str(path), isolation_level=None)
+            conn = _connect_readonly(path)
             timings["open_sqlite"] = time.perf_counter() - start
             if cancel_event.is_set():
                 self._worker_timings = timings
                 self._worker_done = True
                 return
 
-            start = time.perf_counter()
-            cur = conn.cursor()
-            res = cur.execute("SELECT wkt FROM geometry")
-            geometries = [shapely.from_wkt(s[0]) for s in res.fetchall()]
-            geometry = shapely.union_all(geometries)
-            timings["load_geometry_sqlite"] = time.perf_counter() - start
-            if cancel_event.is_set():
-                self._worker_timings = timings
-                self._worker_done = True
-                return
+            geometry_future = geometry_executor.submit(self._load_geometry, path)
 
             start = time.perf_counter()
+            cur = conn.cursor()
             res = cur.execute("SELECT MIN(frame), MAX(frame) FROM trajectory_data")
             min_frame, max_frame = res.fetchone()
             min_frame = int(min_frame) if min_frame is not None else 0
@@ -388,20 +700,62 @@ class JUPEDSIM_OT_load_simulation(Operator):
                 self._worker_done = True
                 return
 
-            start = time.perf_counter()
-            res = cur.execute("SELECT DISTINCT id FROM trajectory_data ORDER BY id ASC")
-            agent_ids = [row[0] for row in res.fetchall()]
-            timings["read_agent_ids"] = time.perf_counter() - start
+            agent_ids = None
+            if not self._load_full_paths or self._big_data_mode or self._auto_big_data_mode:
+                # The agent count decides the mode, and Big Data Mode skips the
+                # path scan, so the ids are read on their own here.
+                start = time.perf_counter()
+                res = cur.execute("SELECT DISTINCT id FROM trajectory_data ORDER BY id ASC")
+                agent_ids = [row[0] for row in res]
+                timings["read_agent_ids"] = time.perf_counter() - start
+
+            big_data_mode = self._big_data_mode
+            auto_big_data = None  # "switched" or "over_budget" when considered
+            buffer_bytes = 0
+            if agent_ids is not None:
+                # Size of the Big Data Mode preload: float32 x, y, z per agent and frame.
+                _, n_rows = _frame_rows(min_frame, max_frame, frame_step)
+                buffer_bytes = n_rows * len(agent_ids) * 12
+            if (
+                not big_data_mode
+                and self._auto_big_data_mode
+                and len(agent_ids) > BIG_DATA_AGENT_THRESHOLD
+            ):
+                if buffer_bytes <= BIG_DATA_AUTO_MAX_BYTES:
+                    big_data_mode = True
+                    auto_big_data = "switched"
+                else:
+                    auto_big_data = "over_budget"
+
+            path_groups = None
+            if self._load_full_paths and not big_data_mode:
+                start = time.perf_counter()
+                path_groups = self._load_full_path_groups(cur, frame_step)
+                if agent_ids is None:
+                    # The path scan yields the ids of every agent with a sampled frame.
+                    agent_ids = [agent_id for agent_id, _ in path_groups]
+                timings["load_full_paths"] = time.perf_counter() - start
+            id_to_index = {agent_id: idx for idx, agent_id in enumerate(agent_ids)}
             if cancel_event.is_set():
                 self._worker_timings = timings
                 self._worker_done = True
                 return
 
-            path_groups = None
-            if self._load_full_paths:
+            positions = None
+            first_row = 0
+            if big_data_mode and buffer_bytes <= BIG_DATA_PRELOAD_MAX_BYTES:
                 start = time.perf_counter()
-                path_groups = self._load_full_path_groups(cur, frame_step)
-                timings["load_full_paths"] = time.perf_counter() - start
+                positions, first_row = self._load_frame_positions(
+                    cur, agent_ids, min_frame, max_frame, frame_step
+                )
+                timings["load_frame_positions"] = time.perf_counter() - start
+                if cancel_event.is_set():
+                    self._worker_timings = timings
+                    self._worker_done = True
+                    return
+
+            # Only per-frame streaming queries by frame; the preload is one scan.
+            frame_index = positions is not None or _has_frame_index(cur)
 
             start = time.perf_counter()
             res = cur.execute("SELECT value FROM metadata WHERE key == 'fps'")
@@ -410,17 +764,28 @@ class JUPEDSIM_OT_load_simulation(Operator):
             num_frames = int(res.fetchone()[0])
             timings["read_metadata"] = time.perf_counter() - start
 
+            start = time.perf_counter()
+            geometry, timings["load_geometry_sqlite"] = geometry_future.result()
+            timings["wait_geometry"] = time.perf_counter() - start
+
             timings["load_sqlite_total"] = time.perf_counter() - start_total
 
             self._worker_data = {
                 "geometry": geometry,
                 "agent_ids": agent_ids,
+                "id_to_index": id_to_index,
                 "min_frame": min_frame,
                 "max_frame": max_frame,
                 "fps": fps,
                 "num_frames": num_frames,
                 "db_path": str(path),
                 "path_groups": path_groups,
+                "positions": positions,
+                "first_row": first_row,
+                "big_data_mode": big_data_mode,
+                "auto_big_data": auto_big_data,
+                "buffer_bytes": buffer_bytes,
+                "frame_index": frame_index,
             }
             self._worker_timings = timings
             self._worker_done = True
@@ -429,9 +794,32 @@ class JUPEDSIM_OT_load_simulation(Operator):
             self._worker_traceback = traceback.format_exc()
             self._worker_done = True
         finally:
+            geometry_executor.shutdown(wait=False, cancel_futures=True)
             if conn is not None:
                 conn.close()
 
+    def _load_geometry(self, path):
+        """Read and union the walkable area geometry on a separate connection.
+
+        With Skip Geometry Union the stored polygons are only collected into
+        one MultiPolygon, which may overlap but draws the same boundaries.
+        Returns ``(geometry, elapsed_seconds)``.
+        """
+        import shapely
+        start = time.perf_counter()
+        conn = _connect_readonly(path)
+        try:
+            res = conn.execute("SELECT wkt FROM geometry")
+            # Parse all WKT strings in one vectorized call.
+            geometries = shapely.from_wkt([row[0] for row in res])
+            if self._skip_geometry_union:
+                geometry = shapely.multipolygons(shapely.get_parts(geometries))
+            else:
+                geometry = shapely.union_all(geometries)
+        finally:
+            conn.close()
+        return geometry, time.perf_counter() - start
+
 
     def _apply_worker_data(self, context):
         """Apply worker results to the modal state."""
@@ -439,13 +827,50 @@ class JUPEDSIM_OT_load_simulation(Operator):
         self._total_agents = len(self._agent_groups)
         self._min_frame = self._worker_data["min_frame"]
         self._max_frame = self._worker_data["max_frame"]
-        self._sampled_frames = set()
         self._path_groups = self._worker_data.get("path_groups")
         context.scene.jupedsim_props.loaded_agent_count = self._total_agents
         context.scene.frame_start = self._min_frame
         context.scene.frame_end = self._max_frame
         for key, value in (self._worker_timings or {}).items():
             self._timings[key] = value
+        auto_big_data = self._worker_data["auto_big_data"]
+        buffer_mb = self._worker_data["buffer_bytes"] / (1 << 20)
+        if auto_big_data == "switched":
+            self._big_data_mode = True
+            self.report(
+                {'WARNING'},
+                f"{self._total_agents} agents exceed {BIG_DATA_AGENT_THRESHOLD}: "
+                f"loading in Big Data Mode ({buffer_mb:.0f} MB of frame data)",
+            )
+        elif auto_big_data == "over_budget":
+            self.report(
+                {'WARNING'},
+                f"{self._total_agents} agents exceed {BIG_DATA_AGENT_THRESHOLD}, but "
+                f"preloading would need {buffer_mb:.0f} MB; streaming from SQLite instead",
+            )
+        if self._big_data_mode and self._worker_data["positions"] is None:
+            self.report(
+                {'WARNING'},
+                f"Preloading all frames would need {buffer_mb:.0f} MB; "
+                "Big Data Mode streams particle positions from SQLite instead",
+            )
+        if self._big_data_mode and self._load_full_paths:
+            self._load_full_paths = False
+            if auto_big_data == "switched":
+                # The user asked for paths and did not ask for Big Data Mode.
+                self.report(
+                    {'WARNING'},
+                    "Big Data Mode: full agent paths are not loaded; "
+                    "disable Auto Big Data Mode to load them",
+                )
+            else:
+                self.report({'INFO'}, "Big Data Mode: full agent paths are not loaded")
+        if not self._worker_data["frame_index"]:
+            self.report(
+                {'WARNING'},
+                "trajectory_data has no index on frame; playback will be slow. "
+                "Add one with: CREATE INDEX frame_id_idx ON trajectory_data(frame, id)",
+            )
         if not self._big_data_mode:
             self._timed_start("create_agents")
 
@@ -477,35 +902,56 @@ class JUPEDSIM_OT_load_simulation(Operator):
             return True
         if self._agent_index == 0:
             self.report({'INFO'}, f"Creating {self._total_agents} agents (every {self._frame_step} frame(s))...")
-        chunk_size = 10
+        props = context.scene.jupedsim_props
+        tick_start = time.perf_counter()
         start = self._agent_index
-        end = min(self._total_agents, start + chunk_size)
-        for idx in range(start, end):
-            agent_id = self._agent_groups[idx]
-            self._create_agent(context, agent_id, self._agents_collection)
+        end = min(self._total_agents, start + self._agent_chunk_size)
+        # Create the whole batch first, then link it in one pass.
+        agent_ids = self._agent_groups
+        new_objects = [
+            self._create_agent(context, agent_ids[idx])
+            for idx in range(start, end)
+        ]
+        link = self._agents_collection.objects.link
+        for agent_obj in new_objects:
+            link(agent_obj)
+        self._agent_objects.extend(new_objects)
         self._agent_index = end
+        self._agent_chunk_size = _adapt_chunk_size(
+            self._agent_chunk_size, end - start, time.perf_counter() - tick_start
+        )
         progress = 25.0 + (self._agent_index / max(1, self._total_agents)) * 45.0
-        context.scene.jupedsim_props.loading_progress = min(progress, 70.0)
+        props.loading_progress = min(progress, 70.0)
         if self._agent_index >= self._total_agents:
             return True
         return False
 
     def _step_create_paths(self, context):
-        """Create a small batch of agent path curves per tick."""
+        """Add a small batch of agent path splines per tick."""
         if not self._path_groups:
             return True
         if self._path_index == 0:
             self._timed_start("create_paths")
-        chunk_size = 10
+            self._path_curve = self._create_path_curve()
+            # One scratch buffer sized for the longest path serves every spline.
+            max_points = max(len(coords) for _, coords in self._path_groups)
+            self._path_points = np.empty((max_points, 4), dtype=np.float32)
+        props = context.scene.jupedsim_props
+        path_groups = self._path_groups
+        total_paths = len(path_groups)
+        tick_start = time.perf_counter()
         start = self._path_index
-        end = min(len(self._path_groups), start + chunk_size)
+        end = min(total_paths, start + self._path_chunk_size)
         for idx in range(start, end):
-            agent_id, coords = self._path_groups[idx]
-            self._create_agent_path(context, agent_id, coords, self._agents_collection)
+            self._add_agent_path(self._path_curve, path_groups[idx][1])
         self._path_index = end
-        progress = 70.0 + (self._path_index / max(1, len(self._path_groups))) * 25.0
-        context.scene.jupedsim_props.loading_progress = min(progress, 95.0)
-        if self._path_index >= len(self._path_groups):
+        props.path_curve_count = len(self._path_curve.splines)
+        self._path_chunk_size = _adapt_chunk_size(
+            self._path_chunk_size, end - start, time.perf_counter() - tick_start
+        )
+        progress = 70.0 + (self._path_index / max(1, total_paths)) * 25.0
+        props.loading_progress = min(progress, 95.0)
+        if self._path_index >= total_paths:
             return True
         return False
 
@@ -531,56 +977,107 @@ class JUPEDSIM_OT_load_simulation(Operator):
         if trace:
             print(trace)
 
-    def _start_streaming(self, mode, objects=None, object_name=None):
+    def _start_streaming(self, mode, objects=None, mesh=None):
         """Register streaming handler and state."""
         STREAM_STATE["db_path"] = self._worker_data["db_path"]
         STREAM_STATE["min_frame"] = self._min_frame
         STREAM_STATE["max_frame"] = self._max_frame
         STREAM_STATE["frame_step"] = self._frame_step
-        STREAM_STATE["agent_ids"] = list(self._agent_groups)
-        STREAM_STATE["id_to_index"] = {
-            agent_id: idx for idx, agent_id in enumerate(self._agent_groups)
-        }
+        STREAM_STATE["agent_ids"] = self._agent_groups
+        STREAM_STATE["id_to_index"] = self._worker_data["id_to_index"]
         STREAM_STATE["mode"] = mode
         STREAM_STATE["objects"] = objects or []
-        STREAM_STATE["object_name"] = object_name
+        STREAM_STATE["visible"] = set()
+        STREAM_STATE["mesh"] = mesh
+        STREAM_STATE["mesh_name"] = mesh.name if mesh is not None else None
+        STREAM_STATE["positions"] = self._worker_data.get("positions")
+        STREAM_STATE["first_row"] = self._worker_data.get("first_row", 0)
+        if STREAM_STATE["positions"] is None:
+            STREAM_STATE["prefetcher"] = _FramePrefetcher(
+                STREAM_STATE["db_path"], self._frame_step, self._max_frame
+            )
         if not STREAM_STATE["handler_installed"]:
             bpy.app.handlers.frame_change_pre.append(_stream_frame_handler)
             STREAM_STATE["handler_installed"] = True
 
+    def _load_frame_positions(self, cursor, agent_ids, min_frame, max_frame, frame_step):
+        """Preload every sampled frame into one float32 buffer for Big Data Mode.
+
+        Returns ``(positions, first_row)`` where row ``frame // frame_step -
+        first_row`` holds the packed (x, y, z) vertex coordinates of all agents
+        for that frame. Agents absent from a frame are parked at a hidden z.
+        """
+        frame_step = max(1, frame_step)
+        first_row, n_rows = _frame_rows(min_frame, max_frame, frame_step)
+        n_agents = len(agent_ids)
+        positions = np.zeros((n_rows, n_agents, 3), dtype=np.float32)
+        positions[:, :, 2] = -1.0e6
+
+        if not n_agents:
+            return positions.reshape(n_rows, 0), first_row
+
+        res = cursor.execute(
+            "SELECT frame, id, pos_x, pos_y FROM trajectory_data "
+            "WHERE frame % (?) == 0",
+            (frame_step,),
+        )
+        lookup = _dense_id_lookup(agent_ids)
+        sorted_ids = np.asarray(agent_ids, dtype=np.int64)
+        for rows in _iter_row_chunks(res, 4):
+            ids = rows[:, 1].astype(np.int64)
+            if lookup is not None:
+                # Ids are dense: one gather instead of a binary search per row.
+                in_range = (ids >= 0) & (ids < len(lookup))
+                agent_idx = lookup[np.where(in_range, ids, 0)]
+                known = in_range & (agent_idx >= 0)
+            else:
+                agent_idx = np.searchsorted(sorted_ids, ids)
+                agent_idx = np.minimum(agent_idx, n_agents - 1)
+                known = sorted_ids[agent_idx] == ids
+            frame_idx = rows[:, 0].astype(np.int64) // frame_step - first_row
+            valid = known & (frame_idx >= 0) & (frame_idx < n_rows)
+            frame_idx, agent_idx = frame_idx[valid], agent_idx[valid]
+            positions[frame_idx, agent_idx, 0] = rows[valid, 2]
+            positions[frame_idx, agent_idx, 1] = rows[valid, 3]
+            positions[frame_idx, agent_idx, 2] = 0.5
+        return positions.reshape(n_rows, n_agents * 3), first_row
+
     def _load_full_path_groups(self, cursor, frame_step):
-        """Load full path coordinates per agent using SQLite cursor."""
+        """Load full path coordinates per agent using SQLite cursor.
+
+        Rows come back sorted by id, so the per-agent partition is a single
+        pass over the id column instead of a dict append per row.
+        """
         res = cursor.execute(
-            "SELECT id, frame, pos_x, pos_y FROM trajectory_data "
-            "ORDER BY id ASC, frame ASC"
+            "SELECT id, pos_x, pos_y FROM trajectory_data "
+            "WHERE frame % (?) == 0 "
+            "ORDER BY id ASC, frame ASC",
+            (max(1, frame_step),),
         )
-        paths = {}
-        for agent_id, frame, x, y in res.fetchall():
-            if frame_step > 1 and frame % frame_step != 0:
-                continue
-            paths.setdefault(agent_id, []).append((float(x), float(y), 0.0))
-        return [(agent_id, coords) for agent_id, coords in paths.items()]
-
-    def _clear_stream_state(self):
-        """Remove frame handlers and clear streaming buffers."""
-        if STREAM_STATE["handler_installed"]:
-            if _stream_frame_handler in bpy.app.handlers.frame_change_pre:
-                bpy.app.handlers.frame_change_pre.remove(_stream_frame_handler)
-        if STREAM_STATE["conn"] is not None:
-            STREAM_STATE["conn"].close()
-        STREAM_STATE["db_path"] = None
-        STREAM_STATE["conn"] = None
-        STREAM_STATE["min_frame"] = 0
-        STREAM_STATE["max_frame"] = 0
-        STREAM_STATE["agent_ids"] = []
-        STREAM_STATE["id_to_index"] = {}
-        STREAM_STATE["mode"] = None
-        STREAM_STATE["objects"] = []
-        STREAM_STATE["object_name"] = None
-        STREAM_STATE["handler_installed"] = False
-    
-    def _get_or_create_collection(self, name):
-        """Get or create a collection with the given name."""
+        id_chunks = []
+        coord_chunks = []
+        for rows in _iter_row_chunks(res, 3):
+            id_chunks.append(rows[:, 0].astype(np.int64))
+            # Blender stores curve points as float32; convert while streaming.
+            coord_chunks.append(rows[:, 1:3].astype(np.float32))
+        if not id_chunks:
+            return []
+        ids = np.concatenate(id_chunks)
+        coords = np.concatenate(coord_chunks)
+        del id_chunks, coord_chunks
+        agent_ids, starts = np.unique(ids, return_index=True)
+        ends = np.append(starts[1:], len(ids))
+        return [
+            (int(agent_id), coords[start:end])
+            for agent_id, start, end in zip(agent_ids, starts, ends)
+        ]
+
+    def _get_or_create_collection(self, name, parent=None):
+        """Get or create a collection with the given name.
+
+        New collections are linked under ``parent``, or the scene collection
+        if no parent is given.
+        """
         if name in bpy.data.collections:
             collection = bpy.data.collections[name]
             # Clear existing objects
@@ -588,39 +1085,45 @@ class JUPEDSIM_OT_load_simulation(Operator):
                 bpy.data.objects.remove(obj, do_unlink=True)
         else:
             collection = bpy.data.collections.new(name)
-            bpy.context.scene.collection.children.link(collection)
+            if parent is None:
+                parent = bpy.context.scene.collection
+            parent.children.link(collection)
         return collection
     
-    def _create_agent(self, context, agent_id, collection):
-        """Create an icosphere object for a single agent (streamed positions)."""
-        mesh = bpy.data.meshes.new(f"Agent_{agent_id}_Mesh")
-        bm = bmesh.new()
-        bmesh.ops.create_icosphere(bm, subdivisions=2, radius=0.5)
-        bm.to_mesh(mesh)
-        bm.free()
-        mesh.polygons.foreach_set("use_smooth", [True] * len(mesh.polygons))
-        mesh.update()
-
-        agent_obj = bpy.data.objects.new(f"Agent_{agent_id}", mesh)
+    def _get_or_create_agent_mesh(self, context):
+        """Get or create the icosphere mesh shared by all agent objects."""
+        if self._agent_mesh is not None:
+            return self._agent_mesh
+        mesh = bpy.data.meshes.get("JuPedSim_Agent_Mesh")
+        if mesh is None:
+            mesh = bpy.data.meshes.new("JuPedSim_Agent_Mesh")
+        fill_agent_mesh(mesh, context.scene.jupedsim_props.agent_scale)
         agent_material = self._get_or_create_material(
             "JuPedSim_Agent_Material", (0.95, 0.7, 0.1, 1.0)
         )
-        self._assign_material(agent_obj, agent_material)
-        agent_obj.scale = (
-            context.scene.jupedsim_props.agent_scale,
-            context.scene.jupedsim_props.agent_scale,
-            context.scene.jupedsim_props.agent_scale,
+        mesh.materials.clear()
+        mesh.materials.append(agent_material)
+        self._agent_mesh = mesh
+        return mesh
+
+    def _create_agent(self, context, agent_id):
+        """Create an unlinked object for a single agent (streamed positions).
+
+        All agents link the same icosphere mesh, so only the object is
+        allocated per agent and the mesh carries the display scale.
+        """
+        agent_obj = bpy.data.objects.new(
+            f"Agent_{agent_id}", self._get_or_create_agent_mesh(context)
         )
 
-        # Add to collection
-        collection.objects.link(agent_obj)
-
         # Initial state; positions are streamed per frame.
         agent_obj.hide_viewport = True
         agent_obj.hide_render = True
+        return agent_obj
     
     def _create_geometry(self, context, geometry, collection):
         """Create curves from the walkable area geometry."""
+        import shapely
         # Support both pedpy geometry and raw shapely geometry
         polygon = geometry.polygon if hasattr(geometry, "polygon") else geometry
 
@@ -666,46 +1169,40 @@ class JUPEDSIM_OT_load_simulation(Operator):
             self._assign_material(plane_obj, plane_material)
             collection.objects.link(plane_obj)
 
-        # Create curves for exterior boundary
-        self._create_curve_from_coords(
+        # One curve object holds the exterior boundary and every interior
+        # hole (obstacle) of every polygon part as separate splines.
+        rings = [
+            shapely.get_coordinates(ring)
+            for ring in shapely.get_rings(shapely.get_parts(polygon))
+        ]
+        self._create_curve_from_rings(
             context,
             "Walkable_Area_Boundary",
-            list(polygon.exterior.coords),
+            rings,
             collection,
             closed=True
         )
+        context.scene.jupedsim_props.loaded_geometry_count = len(rings)
         
-        # Create curves for any interior holes (obstacles)
-        for i, interior in enumerate(polygon.interiors):
-            self._create_curve_from_coords(
-                context,
-                f"Obstacle_{i}",
-                list(interior.coords),
-                collection,
-                closed=True
-            )
-        
-        self.report({'INFO'}, f"Created geometry with {1 + len(list(polygon.interiors))} boundary curves")
+        self.report({'INFO'}, f"Created geometry with {len(rings)} boundary rings")
     
-    def _create_curve_from_coords(self, context, name, coords, collection, closed=False):
-        """Create a curve object from a list of coordinates."""
+    def _create_curve_from_rings(self, context, name, rings, collection, closed=False):
+        """Create one curve object with a spline per coordinate sequence or (N, 2) array."""
         # Create curve data
         curve_data = bpy.data.curves.new(name=name, type='CURVE')
         curve_data.dimensions = '3D'
         curve_data.resolution_u = 2
         
-        # Create spline
-        spline = curve_data.splines.new('POLY')
-        spline.points.add(len(coords) - 1)  # One point already exists
-        
-        # Set point coordinates (x, y, z, w)
-        for i, coord in enumerate(coords):
-            x, y = coord[0], coord[1]
-            z = 0.0  # Ground level for geometry
-            spline.points[i].co = (x, y, z, 1.0)
-        
-        if closed:
-            spline.use_cyclic_u = True
+        for coords in rings:
+            # Create spline
+            spline = curve_data.splines.new('POLY')
+            spline.points.add(len(coords) - 1)  # One point already exists
+            
+            # Set point coordinates (x, y, z, w) at ground level in one call
+            spline.points.foreach_set("co", _pack_curve_points(coords))
+            
+            if closed:
+                spline.use_cyclic_u = True
         
         # Create curve object
         curve_obj = bpy.data.objects.new(name, curve_data)
@@ -723,42 +1220,31 @@ class JUPEDSIM_OT_load_simulation(Operator):
         
         return curve_obj
     
-    def _create_agent_path(self, context, agent_id, coords, collection):
-        """Create a curve representing the path of an agent."""
-        
-        if len(coords) < 2:
-            return  # Need at least 2 points for a curve
-        
-        # Create curve data
-        curve_data = bpy.data.curves.new(name=f"Path_Agent_{agent_id}", type='CURVE')
+    def _create_path_curve(self):
+        """Create the single curve object that holds one spline per agent path."""
+        curve_data = bpy.data.curves.new(name="JuPedSim_Agent_Paths", type='CURVE')
         curve_data.dimensions = '3D'
         curve_data.resolution_u = 2
-        
-        # Create spline
-        spline = curve_data.splines.new('POLY')
-        spline.points.add(len(coords) - 1)  # One point already exists
-        
-        # Set point coordinates (x, y, z, w)
-        for i, coord in enumerate(coords):
-            spline.points[i].co = (*coord, 1.0)
-        
-        # Path is not closed
-        spline.use_cyclic_u = False
-        
-        # Create curve object
-        curve_obj = bpy.data.objects.new(f"Path_Agent_{agent_id}", curve_data)
-        
-        # Add to collection
-        collection.objects.link(curve_obj)
-        
         # Add visual thickness to the path curve (thinner than geometry)
         curve_data.bevel_depth = 0.02
         curve_data.bevel_resolution = 2
-        
-        # Set material color (optional - can be customized)
-        # For now, just make it visible but will be controlled by toggle
-        
-        return curve_obj
+        curve_obj = bpy.data.objects.new("JuPedSim_Agent_Paths", curve_data)
+        self._paths_collection.objects.link(curve_obj)
+        return curve_data
+
+    def _add_agent_path(self, curve_data, coords):
+        """Append the path of an agent as a POLY spline of ``curve_data``.
+
+        Paths with fewer than two points are skipped.
+        """
+        if len(coords) < 2:
+            return  # Need at least 2 points for a curve
+
+        spline = curve_data.splines.new('POLY')
+        spline.points.add(len(coords) - 1)  # One point already exists
+
+        # Set point coordinates (x, y, z, w) in one call
+        spline.points.foreach_set("co", _pack_curve_points(coords, out=self._path_points))
     
     def _create_big_data_points(self, context):
         """Create a single mesh driven by frame-change handler."""
@@ -771,10 +1257,9 @@ class JUPEDSIM_OT_load_simulation(Operator):
         mesh = bpy.data.meshes.new("JuPedSim_Particles")
         mesh.vertices.add(len(agent_ids))
         hide_z = -1.0e6
-        coords = array('f', [0.0] * (len(agent_ids) * 3))
-        for i in range(2, len(coords), 3):
-            coords[i] = hide_z
-        mesh.vertices.foreach_set("co", coords)
+        coords = np.zeros((len(agent_ids), 3), dtype=np.float32)
+        coords[:, 2] = hide_z
+        _set_mesh_positions(mesh, coords.ravel())
         mesh.update()
 
         obj = bpy.data.objects.new("JuPedSim_Particles", mesh)
@@ -835,14 +1320,26 @@ class JUPEDSIM_OT_load_simulation(Operator):
         ps_mod = obj.modifiers.new("JuPedSimParticles", type='PARTICLE_SYSTEM')
         ps_mod.particle_system.settings = ps_settings
 
-        self._start_streaming("big", object_name=obj.name)
+        self._start_streaming("big", mesh=mesh)
     
+    def _set_agents_excluded(self, context, excluded):
+        """Exclude or re-include the agents collection in the active view layer.
+
+        While excluded, newly linked agents and paths are not synced into the
+        view layer one by one; they are picked up once when re-included.
+        """
+        if self._agents_collection is None:
+            return
+        layer_collection = context.view_layer.layer_collection.children.get(
+            self._agents_collection.name
+        )
+        if layer_collection is not None and layer_collection.exclude != excluded:
+            layer_collection.exclude = excluded
+
     def _update_path_visibility(self, collection, visible):
-        """Update visibility of all agent path curves in the collection."""
-        for obj in collection.objects:
-            if obj.name.startswith("Path_Agent_"):
-                obj.hide_viewport = not visible
-                obj.hide_render = not visible
+        """Update visibility of the agent path collection."""
+        collection.hide_viewport = not visible
+        collection.hide_render = not visible
 
 
 classes = [
@@ -857,6 +1354,9 @@ def register():
 
 
 def unregister():
+    # Stop the prefetch thread, close the connections and remove the frame
+    # handler, so the database file is released and a reload starts clean.
+    _clear_stream_state()
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
 
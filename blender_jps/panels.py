@@ -3,10 +3,41 @@ BlenderJPS UI Panels
 User interface panels for the JuPedSim importer.
 """
 
+import os
+
 import bpy
 from bpy.types import Panel
 
-from .preferences import is_pedpy_installed
+from .preferences import INSTALL_STATE, is_pedpy_installed
+
+
+class JUPEDSIM_PT_install_prompt(Panel):
+    """Panel asking to install dependencies, shown only while they are missing."""
+    
+    bl_label = "JuPedSim Importer"
+    bl_idname = "JUPEDSIM_PT_install_prompt"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'JuPedSim'
+    
+    @classmethod
+    def poll(cls, context):
+        return not is_pedpy_installed()
+    
+    def draw(self, context):
+        box = self.layout.box()
+        box.alert = True
+        box.label(text="Dependencies not installed!", icon='ERROR')
+        box.label(text="Go to Edit > Preferences > Add-ons")
+        box.label(text="Find 'BlenderJPS' and install dependencies")
+        box.separator()
+        if INSTALL_STATE["running"]:
+            box.label(text="Installing dependencies...", icon='TIME')
+            box.operator("jupedsim.cancel_install_dependencies", icon='CANCEL')
+        else:
+            box.operator("jupedsim.install_dependencies", 
+                        text="Install Dependencies", 
+                        icon='IMPORT')
 
 
 class JUPEDSIM_PT_main_panel(Panel):
@@ -18,31 +49,22 @@ class JUPEDSIM_PT_main_panel(Panel):
     bl_region_type = 'UI'
     bl_category = 'JuPedSim'
     
+    @classmethod
+    def poll(cls, context):
+        return is_pedpy_installed()
+    
     def draw(self, context):
         layout = self.layout
         props = context.scene.jupedsim_props
         
-        # Check dependencies
-        if not is_pedpy_installed():
-            box = layout.box()
-            box.alert = True
-            box.label(text="Dependencies not installed!", icon='ERROR')
-            box.label(text="Go to Edit > Preferences > Add-ons")
-            box.label(text="Find 'BlenderJPS' and install dependencies")
-            box.separator()
-            box.operator("jupedsim.install_dependencies", 
-                        text="Install Dependencies", 
-                        icon='IMPORT')
-            return
-        
         # File selection section
         box = layout.box()
         box.label(text="Trajectory File", icon='FILE')
         
         # Display selected file or prompt
         if props.sqlite_file:
-            import os
-            filename = os.path.basename(props.sqlite_file)
+            # Files saved before the cached name existed fall back to the path.
+            filename = props.sqlite_file_basename or os.path.basename(props.sqlite_file)
             box.label(text=filename, icon='CHECKMARK')
         else:
             box.label(text="No file selected", icon='QUESTION')
@@ -59,9 +81,14 @@ class JUPEDSIM_PT_main_panel(Panel):
         row = box.row()
         row.prop(props, "big_data_mode", text="Big Data Mode (load agent data as particles)")
         row = box.row()
+        row.prop(props, "auto_big_data_mode", text="Auto Big Data Mode (> 2000 agents)")
+        row.enabled = not props.big_data_mode
+        row = box.row()
         row.prop(props, "load_full_paths", text="Load Full Paths (slow)")
         if props.load_full_paths:
             box.label(text="Warning: may take a long time on large files", icon='ERROR')
+        row = box.row()
+        row.prop(props, "skip_geometry_union", text="Skip Geometry Union")
         
         layout.separator()
         
@@ -92,16 +119,10 @@ class JUPEDSIM_PT_main_panel(Panel):
         row.menu("RENDER_MT_framerate_presets", text=fps_label)
         row = box.row()
         row.prop(props, "show_paths", text="Show Agent Paths")
-        has_paths = False
-        if "JuPedSim_Agents" in bpy.data.collections:
-            agents_collection = bpy.data.collections["JuPedSim_Agents"]
-            path_objects = [
-                obj for obj in agents_collection.objects
-                if obj.name.startswith("Path_Agent_")
-            ]
-            has_paths = bool(path_objects)
-            if has_paths:
-                box.label(text=f"({len(path_objects)} path curves)", icon='CURVE_DATA')
+        path_count = props.path_curve_count
+        has_paths = path_count > 0
+        if has_paths:
+            box.label(text=f"({path_count} path curves)", icon='CURVE_DATA')
         row.enabled = props.load_full_paths and has_paths
         
         # Info section
@@ -124,26 +145,18 @@ class JUPEDSIM_PT_info_panel(Panel):
     
     def draw(self, context):
         layout = self.layout
+        scene = context.scene
+        props = scene.jupedsim_props
         
-        # Count agents and geometry
-        agents_count = 0
-        geometry_count = 0
-        
-        if context.scene.jupedsim_props.loaded_agent_count:
-            agents_count = context.scene.jupedsim_props.loaded_agent_count
-        elif "JuPedSim_Agents" in bpy.data.collections:
-            agents_count = len(bpy.data.collections["JuPedSim_Agents"].objects)
-        
-        if "JuPedSim_Geometry" in bpy.data.collections:
-            geometry_count = len(bpy.data.collections["JuPedSim_Geometry"].objects)
-        
+        # Counts are stored by the loader, so drawing only reads properties
         box = layout.box()
-        box.label(text=f"Agents loaded: {agents_count}")
-        box.label(text=f"Geometry curves: {geometry_count}")
-        box.label(text=f"Frame range: {context.scene.frame_start} - {context.scene.frame_end}")
+        box.label(text=f"Agents loaded: {props.loaded_agent_count}")
+        box.label(text=f"Geometry curves: {props.loaded_geometry_count}")
+        box.label(text=f"Frame range: {scene.frame_start} - {scene.frame_end}")
 
 
 classes = [
+    JUPEDSIM_PT_install_prompt,
     JUPEDSIM_PT_main_panel,
     JUPEDSIM_PT_info_panel,
 ]
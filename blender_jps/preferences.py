@@ -3,9 +3,14 @@ BlenderJPS Addon Preferences
 Handles addon preferences and dependency installation.
 """
 
+import importlib
+import importlib.metadata
+import importlib.util
 import os
 import subprocess
 import sys
+import threading
+import time
 
 import bpy
 from bpy.types import AddonPreferences
@@ -18,6 +23,16 @@ import os
 ADDON_DIR = os.path.dirname(os.path.realpath(__file__))
 DEPS_DIR = os.path.join(ADDON_DIR, "deps")
 
+# Seconds the background pip install may run before it is stopped.
+INSTALL_TIMEOUT = 300
+
+# State of the running background install, shared with the cancel operator
+# and the UI that offers it.
+INSTALL_STATE = {
+    "running": False,
+    "cancel_requested": False,
+}
+
 
 def ensure_deps_in_path():
     """Add the local deps directory to sys.path if it exists."""
@@ -25,15 +40,44 @@ def ensure_deps_in_path():
         sys.path.insert(0, DEPS_DIR)
 
 
+# Cached results of is_pedpy_installed() and get_pedpy_version(); None means
+# "check again". Panels call them on every redraw, so only the
+# install/uninstall operators reset them via invalidate_pedpy_cache().
+_PEDPY_OK = None
+_PEDPY_VERSION = None
+
+
 def is_pedpy_installed():
-    """Check if pedpy is installed and importable."""
-    ensure_deps_in_path()
-    try:
-        import pedpy
+    """Check if pedpy is installed and importable.
+
+    Uses find_spec, which locates the package without running its (slow)
+    top-level imports. The deps folder is put on sys.path at addon load and
+    after an install, not here.
+    """
+    global _PEDPY_OK
+    if _PEDPY_OK is None:
+        _PEDPY_OK = importlib.util.find_spec("pedpy") is not None
+    return _PEDPY_OK
 
-        return True
-    except ImportError:
-        return False
+
+def get_pedpy_version():
+    """Return the installed pedpy version from its package metadata."""
+    global _PEDPY_VERSION
+    if _PEDPY_VERSION is None:
+        try:
+            _PEDPY_VERSION = importlib.metadata.version("pedpy")
+        except importlib.metadata.PackageNotFoundError:
+            _PEDPY_VERSION = "unknown"
+    return _PEDPY_VERSION
+
+
+def invalidate_pedpy_cache():
+    """Forget cached install state after the deps folder changed."""
+    global _PEDPY_OK, _PEDPY_VERSION
+    _PEDPY_OK = None
+    _PEDPY_VERSION = None
+    # Path finders cache directory listings; rescan so find_spec sees changes.
+    importlib.invalidate_caches()
 
 
 def dependencies_installed():
@@ -59,52 +103,48 @@ class JUPEDSIM_OT_install_dependencies(bpy.types.Operator):
     bl_description = "Install pedpy and required packages to addon's local directory"
     bl_options = {"REGISTER"}
 
+    _timer = None
+    _proc = None
+    _reader = None
+    _lines = None
+    _printed = 0
+    _start_time = 0.0
+
     def execute(self, context):
+        """Start pip in the background and poll it from a modal timer."""
+        if INSTALL_STATE["running"]:
+            self.report({"WARNING"}, "Dependency installation is already running.")
+            return {"CANCELLED"}
         py_exec = get_python_executable()
 
         try:
             # Create deps directory if it doesn't exist
             os.makedirs(DEPS_DIR, exist_ok=True)
 
-            # Ensure pip is available
-            self.report({"INFO"}, "Ensuring pip is available...")
-            subprocess.check_call([py_exec, "-m", "ensurepip", "--upgrade"])
+            # Bootstrap pip only if Blender's Python does not bundle it
+            if importlib.util.find_spec("pip") is None:
+                self.report({"INFO"}, "Ensuring pip is available...")
+                # In a subprocess: ensurepip.bootstrap() would strip the
+                # PIP_* settings from Blender's own os.environ.
+                subprocess.check_call([py_exec, "-m", "ensurepip", "--upgrade"])
 
-            # Upgrade pip
-            self.report({"INFO"}, "Upgrading pip...")
-            subprocess.check_call([py_exec, "-m", "pip", "install", "--upgrade", "pip"])
-
-            # Install pedpy and numpy to the local deps directory
+            # Install pedpy and numpy to the local deps directory in one pip run
             self.report({"INFO"}, f"Installing pedpy to {DEPS_DIR}...")
-            subprocess.check_call(
+            self._proc = subprocess.Popen(
                 [
                     py_exec, "-m", "pip", "install",
                     "--target", DEPS_DIR,
                     "--upgrade",
                     "--no-user",
+                    "--disable-pip-version-check",
                     "pedpy",
                     "numpy<2.0",
                 ],
-                timeout=300,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
             )
-
-            # Add to path immediately so it works without restart
-            ensure_deps_in_path()
-
-            # Verify installation
-            if is_pedpy_installed():
-                self.report({"INFO"}, "Dependencies installed successfully!")
-                self.report(
-                    {"INFO"}, "You may need to restart Blender if imports still fail."
-                )
-            else:
-                self.report(
-                    {"WARNING"},
-                    "Installation completed but import still failing. Please restart Blender.",
-                )
-
-            return {"FINISHED"}
-
         except subprocess.CalledProcessError as e:
             self.report({"ERROR"}, f"Failed to install dependencies: {e}")
             self.report(
@@ -116,6 +156,129 @@ class JUPEDSIM_OT_install_dependencies(bpy.types.Operator):
             self.report({"ERROR"}, f"Unexpected error: {e}")
             return {"CANCELLED"}
 
+        # Pipes cannot be made non-blocking on Windows before Python 3.12,
+        # so a reader thread collects pip's output for the modal loop.
+        self._lines = []
+        self._printed = 0
+        self._reader = threading.Thread(target=self._read_output, daemon=True)
+        self._reader.start()
+        self._start_time = time.monotonic()
+
+        INSTALL_STATE["running"] = True
+        INSTALL_STATE["cancel_requested"] = False
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.2, window=context.window)
+        wm.modal_handler_add(self)
+        return {"RUNNING_MODAL"}
+
+    def modal(self, context, event):
+        """Forward pip output and finish once the process exits."""
+        # Esc keeps reaching the editors; only the Cancel button stops pip.
+        if event.type != "TIMER":
+            return {"PASS_THROUGH"}
+
+        if INSTALL_STATE["cancel_requested"]:
+            self._stop_process()
+            self._cleanup_timer(context)
+            self.report({"WARNING"}, "Dependency installation cancelled.")
+            return {"CANCELLED"}
+
+        self._print_output()
+        returncode = self._proc.poll()
+        if returncode is None:
+            if time.monotonic() - self._start_time > INSTALL_TIMEOUT:
+                self._stop_process()
+                self._cleanup_timer(context)
+                self.report(
+                    {"ERROR"},
+                    f"Installation timed out after {INSTALL_TIMEOUT} seconds.",
+                )
+                return {"CANCELLED"}
+            return {"PASS_THROUGH"}
+
+        self._reader.join(timeout=1.0)
+        self._print_output()
+        self._cleanup_timer(context)
+        if returncode != 0:
+            self.report(
+                {"ERROR"},
+                f"Failed to install dependencies: pip exited with code {returncode}",
+            )
+            self.report(
+                {"ERROR"},
+                "Try running Blender as administrator if permission errors occur.",
+            )
+            return {"CANCELLED"}
+        return self._finish_install()
+
+    def _finish_install(self):
+        """Make the new packages importable and verify the installation."""
+        # Add to path immediately so it works without restart
+        ensure_deps_in_path()
+        invalidate_pedpy_cache()
+
+        # Verify installation
+        if is_pedpy_installed():
+            self.report({"INFO"}, "Dependencies installed successfully!")
+            self.report(
+                {"INFO"}, "You may need to restart Blender if imports still fail."
+            )
+        else:
+            self.report(
+                {"WARNING"},
+                "Installation completed but import still failing. Please restart Blender.",
+            )
+
+        return {"FINISHED"}
+
+    def _read_output(self):
+        """Collect pip output lines until the pipe closes (reader thread)."""
+        for line in self._proc.stdout:
+            self._lines.append(line.rstrip())
+        self._proc.stdout.close()
+
+    def _print_output(self):
+        """Print pip output lines that arrived since the last tick."""
+        lines = self._lines[self._printed:]
+        self._printed += len(lines)
+        for line in lines:
+            print(f"[BlenderJPS] pip: {line}")
+
+    def _stop_process(self):
+        """Terminate a still-running pip process."""
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.terminate()
+            try:
+                self._proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+
+    def _cleanup_timer(self, context):
+        """Remove the modal timer and mark the install as finished."""
+        if self._timer:
+            context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
+        INSTALL_STATE["running"] = False
+        INSTALL_STATE["cancel_requested"] = False
+
+
+class JUPEDSIM_OT_cancel_install_dependencies(bpy.types.Operator):
+    """Cancel the running dependency installation."""
+
+    bl_idname = "jupedsim.cancel_install_dependencies"
+    bl_label = "Cancel Installation"
+    bl_description = "Stop the running pip install"
+    bl_options = {"REGISTER"}
+
+    @classmethod
+    def poll(cls, context):
+        return INSTALL_STATE["running"]
+
+    def execute(self, context):
+        # The install operator stops pip on its next timer tick.
+        INSTALL_STATE["cancel_requested"] = True
+        return {"FINISHED"}
+
 
 class JUPEDSIM_OT_uninstall_dependencies(bpy.types.Operator):
     """Remove installed dependencies."""
@@ -135,6 +298,7 @@ class JUPEDSIM_OT_uninstall_dependencies(bpy.types.Operator):
                     sys.path.remove(DEPS_DIR)
 
                 shutil.rmtree(DEPS_DIR)
+                invalidate_pedpy_cache()
                 self.report({"INFO"}, "Dependencies uninstalled successfully.")
             except Exception as e:
                 self.report({"ERROR"}, f"Failed to remove deps folder: {e}")
@@ -166,16 +330,9 @@ class JuPedSimAddonPreferences(AddonPreferences):
             row = box.row()
             row.label(text="pedpy: Installed", icon="CHECKMARK")
 
-            # Show version if possible
-            try:
-                ensure_deps_in_path()
-                import pedpy
-
-                version = getattr(pedpy, "__version__", "unknown")
-                row = box.row()
-                row.label(text=f"Version: {version}")
-            except:
-                pass
+            # Show version without importing pedpy
+            row = box.row()
+            row.label(text=f"Version: {get_pedpy_version()}")
 
             box.separator()
             row = box.row()
@@ -191,19 +348,25 @@ class JuPedSimAddonPreferences(AddonPreferences):
 
             row = box.row()
             row.scale_y = 1.5
-            row.operator("jupedsim.install_dependencies", icon="IMPORT")
+            if INSTALL_STATE["running"]:
+                row.label(text="Installing dependencies...", icon="TIME")
+                row.operator("jupedsim.cancel_install_dependencies", icon="CANCEL")
+            else:
+                row.operator("jupedsim.install_dependencies", icon="IMPORT")
 
 
 classes = [
     JUPEDSIM_OT_install_dependencies,
+    JUPEDSIM_OT_cancel_install_dependencies,
     JUPEDSIM_OT_uninstall_dependencies,
     JuPedSimAddonPreferences,
 ]
 
 
 def register():
-    # Ensure deps are in path on addon load
+    # Ensure deps are in path on addon load and prime the install check
     ensure_deps_in_path()
+    is_pedpy_installed()
 
     for cls in classes:
         bpy.utils.register_class(cls)